@@ -1,10 +1,8 @@
 import numpy as np
-import pandas as pd
 from scipy.optimize import minimize
 from typing import Tuple
 from PortfolioData import PortfolioData
-
-default_bounds = (0, 1)
+from constraints import default_bounds, compile_constraints
 
 class Portfolio:
 	def __init__(self, data: PortfolioData, weights: np.ndarray):
@@ -18,12 +16,12 @@ class Portfolio:
 
 		Args:
 			weights (np.ndarray): Portfolio weights
-			log_returns (pd.DataFrame): Daily log returns
+			mean_returns (pd.Series): Annualized mean log returns
 
 		Returns:
 			float: Portfolio expected return (annualized)
 		"""	
-		return np.sum(self.data.log_returns.mean() * self.weights) * 252
+		return np.sum(self.data.mean_returns * self.weights)
 
 	@property
 	def expected_volatility(self):
@@ -57,67 +55,63 @@ class Portfolio:
 
 	@classmethod
 	def max_sharpe_portfolio(cls, data: PortfolioData, bounds: Tuple[float, float] = None):
-		n = data.log_returns.shape[1]
-		bounds = bounds or default_bounds # default: no shorting, max 50% per asset
-		initial_weights = np.array([1/n] * n) # Doesn"t change output
-
-		constraints = ({"type": "eq", "fun": lambda w: np.sum(w) - 1})
+		compiled = compile_constraints(data, bounds) # default bounds: no shorting, max 100% per asset
 		
-		def neg_sharpe(weights: np.ndarray, log_returns: pd.DataFrame, cov_matrix: np.ndarray, risk_free_rate: float) -> float:
-			exp_returns = np.sum(log_returns.mean() * weights) * 252
+		def neg_sharpe(weights: np.ndarray, mean_returns: np.ndarray, cov_matrix: np.ndarray, risk_free_rate: float) -> float:
+			exp_returns = mean_returns @ weights
 			exp_volatility = np.sqrt(weights.T @ cov_matrix @ weights)
 			return -((exp_returns - risk_free_rate) / exp_volatility)
 
-		result = minimize(neg_sharpe, initial_weights, args=(
-							data.log_returns, data.annualized_covariance, data.risk_free_rate),
-							method="SLSQP", bounds=[bounds]*n, constraints=constraints
+		def neg_sharpe_gradient(weights: np.ndarray, mean_returns: np.ndarray, cov_matrix: np.ndarray, risk_free_rate: float) -> np.ndarray:
+			cov_weights = cov_matrix @ weights
+			exp_volatility = np.sqrt(weights @ cov_weights)
+			excess_return = mean_returns @ weights - risk_free_rate
+			return -(mean_returns / exp_volatility - excess_return * cov_weights / exp_volatility**3)
+
+		fun, jac = compiled.objective(neg_sharpe, neg_sharpe_gradient)
+		result = minimize(fun, compiled.initial_weights(), args=(
+							compiled.mean_returns, np.asarray(data.annualized_covariance), data.risk_free_rate),
+							method="SLSQP", jac=jac, bounds=compiled.bounds, constraints=compiled.constraints
 						)
 
 		if not result.success:
 			raise ValueError("Optimization failed to find maximum Sharpe ratio portfolio.")
 
-		return cls(data, result.x)
+		return cls(data, compiled.weights(result.x))
 
 	@classmethod
 	def min_variance_portfolio(cls, data: PortfolioData, bounds: Tuple[float, float] = None):
-		n = data.log_returns.shape[1]
-		bounds = bounds or default_bounds # default: no shorting, max 50% per asset
-		initial_weights = np.array([1/n] * n) # Doesn"t change output
+		compiled = compile_constraints(data, bounds) # default bounds: no shorting, max 100% per asset
+		fun, jac = compiled.objective(risk, risk_gradient)
 
-		constraints = ({"type": "eq", "fun": lambda w: np.sum(w) - 1})
-		
-		def risk(weights: np.ndarray, cov_matrix: np.ndarray) -> float:
-			return np.sqrt(weights.T @ cov_matrix @ weights)
-
-		result = minimize(risk, initial_weights, args=(data.annualized_covariance,),
-						 	method="SLSQP", bounds=[bounds]*n, constraints=constraints
+		result = minimize(fun, compiled.initial_weights(), args=(np.asarray(data.annualized_covariance),),
+						 	method="SLSQP", jac=jac, bounds=compiled.bounds, constraints=compiled.constraints
 						)
 
 		if not result.success:
 			raise ValueError("Optimization failed to find minimum variance portfolio.")
 
-		return cls(data, result.x)
+		return cls(data, compiled.weights(result.x))
 
 	@classmethod
 	def from_target_return(cls, data: PortfolioData, target_return: float, bounds: Tuple[float, float]):
-		n = data.log_returns.shape[1]
-		bounds = bounds or default_bounds # default: no shorting, max 50% per asset
-		annualized_covariance = data.annualized_covariance
-		initial_weights = np.array([1 / len(data.tickers)] * len(data.tickers))
-
-		constraints = (
-			{"type": "eq", "fun": lambda w: np.sum(w) - 1},
-			{"type": "eq", "fun": lambda w: np.sum(w * data.mean_returns) - target_return}
-		)
-		def risk(weights: np.ndarray, cov_matrix: np.ndarray) -> float:
-			return np.sqrt(weights.T @ cov_matrix @ weights)
+		compiled = compile_constraints(data, bounds) # default bounds: no shorting, max 100% per asset
+		fun, jac = compiled.objective(risk, risk_gradient)
 
 		# Minimize risk (volatility) with target return
-		result = minimize(risk, initial_weights, args=(annualized_covariance),
-						 	method="SLSQP", bounds=[bounds]*n, constraints=constraints
+		result = minimize(fun, compiled.initial_weights(), args=(np.asarray(data.annualized_covariance),),
+						 	method="SLSQP", jac=jac, bounds=compiled.bounds, constraints=compiled.with_target(target_return)
 						)
 
 		if not result.success:
 			raise ValueError("Optimization failed for target return.")
 
-		return cls(data, result.x)
+		return cls(data, compiled.weights(result.x))
+
+
+def risk(weights: np.ndarray, cov_matrix: np.ndarray) -> float:
+	return np.sqrt(weights.T @ cov_matrix @ weights)
+
+def risk_gradient(weights: np.ndarray, cov_matrix: np.ndarray) -> np.ndarray:
+	cov_weights = cov_matrix @ weights
+	return cov_weights / np.sqrt(weights @ cov_weights)
@@ -5,12 +5,16 @@ from fetch_data import fetch_data
 from fredapi import Fred
 from typing import List
 
+thin_observations = 252 # Series with less than a year of returns are flagged as thin
+
 class PortfolioData():
-	def __init__(self, tickers: List[str], start: str, end: str, risk_free_rate=None):
+	def __init__(self, tickers: List[str], start: str, end: str, risk_free_rate=None, psd_repair=True, constraints=None):
 		self.tickers = tickers
 		self.start = start
 		self.end = end 
 		self.risk_free_rate = fred_risk_free_rate() if risk_free_rate is None else risk_free_rate # 0 is falsy :(
+		self.psd_repair = psd_repair # Pairwise covariances aren't guaranteed PSD when histories differ
+		self.constraints = constraints # ConstraintSpec, compiled once per bounds by the optimizers
 
 	@cached_property
 	def prices(self) -> pd.DataFrame:
@@ -19,17 +23,89 @@ class PortfolioData():
 
 	@cached_property
 	def log_returns(self) -> pd.DataFrame:
-		return np.log(self.prices / self.prices.shift(1)).dropna() 
+		# Returns on each ticker's own dates, so a missing print moves that return to the next print
+		# instead of dropping it; then align, only dropping dates with no returns at all
+		returns = []
+		for ticker in self.prices.columns:
+			prices = self.prices[ticker].dropna()
+			returns.append(np.log(prices / prices.shift(1)))
+
+		return pd.concat(returns, axis=1, join="outer", sort=True).dropna(how="all")
 
 	@cached_property
-	def annualized_covariance(self) -> np.ndarray:
-		return self.log_returns.cov() * 252
+	def valid_mask(self) -> np.ndarray:
+		return self.log_returns.notna().to_numpy()
+
+	@cached_property
+	def annualized_covariance(self) -> pd.DataFrame:
+		"""
+		Annualized covariance over pairwise-available observations.
+
+		Equivalent to pandas' pairwise cov, computed with masked matrix products
+		instead of a loop over asset pairs.
+
+		Returns:
+			pd.DataFrame: Covariance matrix (index/columns = tickers)
+		"""
+		mask = self.valid_mask.astype(float)
+		x = np.where(self.valid_mask, self.log_returns.to_numpy(), 0.0)
+
+		counts = mask.T @ mask # Observations shared by each pair
+		sums = x.T @ mask # sums[i, j]: sum of asset i over dates where j is also valid
+		products = x.T @ x
+
+		with np.errstate(divide="ignore", invalid="ignore"):
+			cov = (products - sums * sums.T / counts) / (counts - 1)
+		cov = np.where(counts > 1, cov, 0.0) * 252 # No overlap -> no information
+
+		if self.psd_repair:
+			cov = nearest_psd(cov)
+
+		return pd.DataFrame(cov, index=self.log_returns.columns, columns=self.log_returns.columns)
 
 	@cached_property
 	def mean_returns(self) :
 		return self.log_returns.mean() * 252
 
+	@cached_property
+	def coverage(self) -> pd.DataFrame:
+		"""
+		Per-asset history coverage of the aligned return panel.
+
+		Returns:
+			pd.DataFrame: first/last valid date, observations, fraction of panel dates covered
+				and a thin flag (fewer than thin_observations returns), indexed by ticker
+		"""
+		log_returns = self.log_returns
+		observations = self.valid_mask.sum(axis=0)
+
+		return pd.DataFrame({
+			"first_valid": [log_returns[t].first_valid_index() for t in log_returns.columns],
+			"last_valid": [log_returns[t].last_valid_index() for t in log_returns.columns],
+			"observations": observations,
+			"coverage": observations / max(len(log_returns), 1),
+			"thin": observations < thin_observations,
+		}, index=log_returns.columns)
+
+
+
+
+def nearest_psd(matrix: np.ndarray) -> np.ndarray:
+	"""
+	Clips negative eigenvalues so a pairwise covariance is usable by the optimizers.
+
+	Args:
+		matrix (np.ndarray): Symmetric matrix
+
+	Returns:
+		np.ndarray: The matrix unchanged if already PSD, otherwise its eigenvalue-clipped repair
+	"""
+	eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+	if eigenvalues.min() >= 0:
+		return matrix
 
+	repaired = (eigenvectors * np.clip(eigenvalues, 0, None)) @ eigenvectors.T
+	return (repaired + repaired.T) / 2
 
 
 @lru_cache()
@@ -1,27 +1,32 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QCheckBox,
     QLabel, QListWidget, QSlider, QGroupBox, QListWidgetItem,
-	QDateEdit, QFormLayout, QPushButton, QLineEdit, QSpinBox, QFileDialog
+	QDateEdit, QFormLayout, QPushButton, QLineEdit, QSpinBox, QFileDialog, QMessageBox
 )
 from Portfolio import Portfolio
 from PortfolioData import PortfolioData
 from PyQt6.QtCore import Qt, QDate
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-from plot import plot_pie_chart, plot_efficient_frontier, small_threshold
+from plot import plot_pie_chart, plot_efficient_frontier, plot_frontier_overlay, small_threshold
+from export import export_frontier
+from universe import UniverseComparison
 from datetime import datetime, timedelta
 import csv
 
 class PortfolioWindow(QWidget):
-	def __init__(self, tickers):
+	def __init__(self, tickers, other_universes=None, constraints=None):
 		super().__init__()
 		self.tickers = tickers
+		self.constraints = constraints # ConstraintSpec from constraints.json, if any
+		self.other_universes = other_universes or {} # name -> tickers, overlaid on the frontier plot
+		self.comparison = None
 
 		self.end_date = datetime.now() # Today
 		self.start_date = self.end_date - timedelta(days=10*365) # Five years ago
 		self.points = 50
 
-		self.portfolio_data = PortfolioData(tickers, self.start_date, self.end_date)
+		self.portfolio_data = PortfolioData(tickers, self.start_date, self.end_date, constraints=constraints)
 		self.bounds_max = 1 # default upper bound
 		self.current_portfolio = Portfolio.max_sharpe_portfolio(self.portfolio_data, (0, self.bounds_max))
 
@@ -140,6 +145,11 @@ class PortfolioWindow(QWidget):
 		self.export_button.clicked.connect(self.export_weights)  # Call the function
 		weight_layout.addWidget(self.export_button, alignment=Qt.AlignmentFlag.AlignCenter)
 
+		self.export_frontier_button = QPushButton("Export Frontier")
+		self.export_frontier_button.setMinimumHeight(40)
+		self.export_frontier_button.clicked.connect(self.export_frontier)
+		weight_layout.addWidget(self.export_frontier_button, alignment=Qt.AlignmentFlag.AlignCenter)
+
 		# Stats layout BELOW the list
 		stats_layout = QFormLayout()
 		stats_layout.setLabelAlignment(Qt.AlignmentFlag.AlignLeft)
@@ -287,6 +297,19 @@ class PortfolioWindow(QWidget):
 				if weight > small_threshold: # Only include weights not near 0 (floating point error)
 					writer.writerow([ticker, f"{weight:.6f}"])
 
+	def export_frontier(self, checked):
+		# Appends the plotted frontier (plus tangency and GMV) to a dataset directory
+		directory = QFileDialog.getExistingDirectory(self, "Export Frontier to Dataset Directory")
+		if not directory:
+			return  # User cancelled the dialog
+
+		# Export what was rendered, not settings changed since the last render
+		data, bounds, portfolios = self.rendered_frontier
+		try:
+			export_frontier(directory, data, bounds, frontier_portfolios=portfolios)
+		except (ValueError, ImportError, OSError) as e: # Raising in a slot would abort the app
+			QMessageBox.warning(self, "Export Frontier", f"Export failed: {e}")
+
 	def on_frontier_press(self, event):
 		if event.inaxes is None:
 			return 
@@ -365,10 +388,12 @@ class PortfolioWindow(QWidget):
 	def update_weights(self):
 		self.weight_list.clear()
 		weights = self.current_portfolio.weights
+		thin = self.current_portfolio.data.coverage["thin"] # Less than a year of returns
 		for i, ticker in enumerate(self.tickers):
 			if weights[i] < small_threshold:
 				continue
-			item = QListWidgetItem(f"{ticker}: {weights[i]*100:.2f}%")
+			label = f"{ticker} (thin history)" if thin.iloc[i] else ticker
+			item = QListWidgetItem(f"{label}: {weights[i]*100:.2f}%")
 			self.weight_list.addItem(item)
 
 	def on_start_changed(self, date):
@@ -385,7 +410,10 @@ class PortfolioWindow(QWidget):
 
 	# DOESN"T rerender graphs, just changed internal portfolio_data
 	def update_portfolio_data(self):
-		self.portfolio_data = PortfolioData(self.tickers, self.start_date, self.end_date)
+		self.portfolio_data = PortfolioData(self.tickers, self.start_date, self.end_date, constraints=self.constraints)
+		if self.comparison:
+			self.comparison.close()
+			self.comparison = None # Rebuilt for the new window on next render
 
 	def update_main_plot(self):
 		bounds = (0, self.bounds_max)
@@ -399,6 +427,14 @@ class PortfolioWindow(QWidget):
 
 		self.efficient_artists = plot_efficient_frontier(ax, self.portfolio_data, bounds, 
 													show_cml=show_cml, show_gmv=show_gmv, show_tangency=show_tangency, points=self.points*2)
+		self.rendered_frontier = (self.portfolio_data, bounds, ax.frontier_portfolios)
+		if self.other_universes:
+			if self.comparison is None:
+				self.comparison = UniverseComparison(self.start_date, self.end_date, self.portfolio_data.risk_free_rate,
+													 constraints=self.constraints)
+				for name, tickers in self.other_universes.items():
+					self.comparison.add(name, tickers)
+			plot_frontier_overlay(ax, self.comparison.frontiers(bounds, self.points*2))
 		self.toggle_artists()
 
 	def update_pie_chart(self):
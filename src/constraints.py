@@ -0,0 +1,227 @@
+import json
+import numpy as np
+from scipy import sparse
+from typing import Tuple, Dict, Sequence
+
+default_bounds = (0, 1)
+
+
+class ConstraintSpec:
+	def __init__(self, asset_bounds: Dict[str, Tuple[float, float]] = None, groups: Dict[str, dict] = None,
+				 holdings: Dict[str, float] = None, turnover: float = None):
+		"""
+		Universe-independent portfolio constraints, as loaded from a constraints file.
+
+		Args:
+			asset_bounds (Dict[str, Tuple[float, float]]): Per-ticker (min, max) weight, None for no limit
+			groups (Dict[str, dict]): Group name -> {"tickers": [...], "min": float, "max": float}
+			holdings (Dict[str, float]): Current weights (missing tickers are 0)
+			turnover (float): Max total turnover sum(|w - holdings|) against the current holdings
+		"""
+		self.asset_bounds = asset_bounds or {}
+		self.groups = groups or {}
+		self.holdings = holdings or {}
+		self.turnover = turnover
+
+	@classmethod
+	def from_json(cls, file_path: str):
+		"""
+		Loads constraints from a JSON file, e.g. constraints.json next to tickers.csv:
+
+			{
+				"assets": {"AAPL": {"max": 0.2}},
+				"groups": {"Tech": {"tickers": ["AAPL", "MSFT"], "max": 0.4}},
+				"holdings": {"AAPL": 0.1, "MSFT": 0.05},
+				"turnover": 0.5
+			}
+		"""
+		with open(file_path, mode="r") as file:
+			spec = json.load(file)
+
+		asset_bounds = {t: (b.get("min"), b.get("max")) for t, b in spec.get("assets", {}).items()}
+		return cls(asset_bounds, spec.get("groups"), spec.get("holdings"), spec.get("turnover"))
+
+	def to_dict(self) -> dict:
+		"""
+		Returns:
+			dict: JSON-serializable constraints in the from_json layout
+		"""
+		return {
+			"assets": {t: {"min": lo, "max": hi} for t, (lo, hi) in self.asset_bounds.items()},
+			"groups": self.groups,
+			"holdings": self.holdings,
+			"turnover": self.turnover,
+		}
+
+
+class CompiledConstraints:
+	def __init__(self, tickers: Sequence[str], mean_returns: np.ndarray, bounds: Tuple[float, float] = None,
+				 spec: ConstraintSpec = None):
+		"""
+		Compiles a ConstraintSpec for one universe into SLSQP bounds and constraints.
+
+		Built once per universe and bounds: all group caps become a single sparse matrix
+		evaluated in one call with a constant Jacobian, so adding groups doesn't add
+		per-evaluation Python overhead.
+
+		With a turnover limit the variables are lifted to x = [w, buys, sells], with
+		w - buys + sells = holdings, buys, sells >= 0 and sum(buys + sells) <= turnover,
+		so every constraint stays linear. Optimizers go through size, bounds,
+		initial_weights, objective and weights rather than assuming x = w.
+
+		Args:
+			tickers (Sequence[str]): Universe tickers (column order of the weights)
+			mean_returns (np.ndarray): Annualized mean returns, for target return constraints
+			bounds (Tuple[float, float]): Default per-asset bounds, intersected with the spec's
+			spec (ConstraintSpec): Constraints to compile (None for budget + bounds only)
+
+		Raises:
+			ValueError: If the per-asset, group or turnover limits are contradictory or can't be met
+		"""
+		spec = spec or ConstraintSpec()
+		bounds = bounds or default_bounds
+		index = {t: i for i, t in enumerate(tickers)}
+		n = len(tickers)
+		self.mean_returns = np.asarray(mean_returns, dtype=float)
+
+		# Per-asset bounds
+		self.lower = np.full(n, float(bounds[0]))
+		self.upper = np.full(n, float(bounds[1]))
+		for ticker, (lo, hi) in spec.asset_bounds.items():
+			if ticker in index:
+				i = index[ticker]
+				self.lower[i] = self.lower[i] if lo is None else max(self.lower[i], lo)
+				self.upper[i] = self.upper[i] if hi is None else min(self.upper[i], hi)
+
+		crossed = self.lower > self.upper
+		if crossed.any():
+			raise ValueError(f"Weight bounds have min > max for {', '.join(np.asarray(tickers)[crossed])}.")
+		if self.lower.sum() > 1 or self.upper.sum() < 1:
+			raise ValueError(f"Weight bounds can't sum to 1 (min total {self.lower.sum():.4g}, max total {self.upper.sum():.4g}).")
+
+		# Group caps as one sparse membership matrix (groups x assets)
+		rows, cols, group_lower, group_upper = [], [], [], []
+		for group in spec.groups.values():
+			members = [index[t] for t in group.get("tickers", []) if t in index]
+			if not members:
+				continue
+			rows += [len(group_lower)] * len(members)
+			cols += members
+			group_lower.append(-np.inf if group.get("min") is None else group["min"])
+			group_upper.append(np.inf if group.get("max") is None else group["max"])
+		self.groups = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(group_lower), n))
+		self.group_lower = np.array(group_lower, dtype=float)
+		self.group_upper = np.array(group_upper, dtype=float)
+
+		# Groups the per-asset bounds can't reach
+		reachable_lower, reachable_upper = self.groups @ self.lower, self.groups @ self.upper
+		names = [name for name, group in spec.groups.items() if any(t in index for t in group.get("tickers", []))]
+		for name, lo, hi, reach_lo, reach_hi in zip(names, self.group_lower, self.group_upper, reachable_lower, reachable_upper):
+			if lo > hi or lo > reach_hi or hi < reach_lo:
+				raise ValueError(f"Group {name!r} bounds [{lo:.4g}, {hi:.4g}] can't be met by its members' "
+								 f"weight bounds (reachable [{reach_lo:.4g}, {reach_hi:.4g}]).")
+
+		self.holdings = np.array([spec.holdings.get(t, 0.0) for t in tickers], dtype=float)
+		self.turnover = spec.turnover
+
+		if self.turnover is not None:
+			# Holdings outside the bounds must trade to them, and the clipped weights to the budget
+			clipped = np.clip(self.holdings, self.lower, self.upper)
+			min_turnover = np.abs(self.holdings - clipped).sum() + abs(1 - clipped.sum())
+			if min_turnover > self.turnover + 1e-9:
+				raise ValueError(f"Turnover limit {self.turnover:.4g} can't be met: the holdings need at least "
+								 f"{min_turnover:.4g} turnover to fit the weight bounds and sum to 1.")
+
+		self.n = n
+		self.size = n if self.turnover is None else 3 * n
+		self.bounds = list(zip(self.lower, self.upper)) + [(0, None)] * (self.size - n)
+
+		budget = np.concatenate([np.ones(n), np.zeros(self.size - n)])
+		constraints = [{"type": "eq", "fun": lambda x: budget @ x - 1, "jac": lambda x: budget}]
+
+		if self.groups.shape[0]:
+			# upper - G w >= 0 and G w - lower >= 0, finite sides only
+			has_upper, has_lower = np.isfinite(self.group_upper), np.isfinite(self.group_lower)
+			A = self._lift(sparse.vstack([-self.groups[has_upper], self.groups[has_lower]], format="csr"))
+			b = np.concatenate([self.group_upper[has_upper], -self.group_lower[has_lower]])
+			A_dense = A.toarray()
+			constraints.append({"type": "ineq", "fun": lambda x: A @ x + b, "jac": lambda x: A_dense})
+
+		if self.turnover is not None:
+			# w - buys + sells = holdings and turnover - sum(buys + sells) >= 0
+			identity = sparse.identity(n, format="csr")
+			trades = sparse.hstack([identity, -identity, identity], format="csr")
+			trades_dense = trades.toarray()
+			holdings, turnover = self.holdings, self.turnover
+			traded = np.concatenate([np.zeros(n), -np.ones(2 * n)])
+			constraints += [
+				{"type": "eq", "fun": lambda x: trades @ x - holdings, "jac": lambda x: trades_dense},
+				{"type": "ineq", "fun": lambda x: turnover + traded @ x, "jac": lambda x: traded},
+			]
+
+		self.constraints = tuple(constraints)
+
+	def initial_weights(self) -> np.ndarray:
+		"""
+		Returns:
+			np.ndarray: Equal weights, with the buys and sells that reach them if lifted
+		"""
+		weights = np.full(self.n, 1 / self.n)
+		if self.size == self.n:
+			return weights
+		return np.concatenate([weights, np.maximum(weights - self.holdings, 0), np.maximum(self.holdings - weights, 0)])
+
+	def weights(self, x: np.ndarray) -> np.ndarray:
+		"""
+		Returns:
+			np.ndarray: Asset weights of an optimizer solution x
+		"""
+		return x[:self.n]
+
+	def objective(self, fun, jac) -> tuple:
+		"""
+		Wraps an objective of the weights and its gradient to take x (they're returned as is if not lifted).
+
+		Returns:
+			tuple: fun(x, *args), jac(x, *args)
+		"""
+		if self.size == self.n:
+			return fun, jac
+
+		n, padding = self.n, np.zeros(self.size - self.n)
+		return (lambda x, *args: fun(x[:n], *args),
+				lambda x, *args: np.concatenate([jac(x[:n], *args), padding]))
+
+	def _lift(self, A: sparse.csr_matrix) -> sparse.csr_matrix:
+		# Pads asset-level constraint rows with zero columns for buys and sells
+		return sparse.hstack([A, sparse.csr_matrix((A.shape[0], self.size - self.n))], format="csr")
+
+	def with_target(self, target_return: float) -> tuple:
+		"""
+		Returns:
+			tuple: The compiled constraints plus mean_returns . w = target_return
+		"""
+		mean_returns = np.concatenate([self.mean_returns, np.zeros(self.size - self.n)])
+		return self.constraints + ({
+			"type": "eq",
+			"fun": lambda x: mean_returns @ x - target_return,
+			"jac": lambda x: mean_returns,
+		},)
+
+
+def compile_constraints(data, bounds: Tuple[float, float] = None) -> CompiledConstraints:
+	"""
+	Compiles data.constraints for data's universe, once per bounds.
+
+	Args:
+		data (PortfolioData): Universe (its constraints attribute may be None)
+		bounds (Tuple[float, float]): Default per-asset bounds
+
+	Returns:
+		CompiledConstraints: Cached on data
+	"""
+	bounds = tuple(bounds or default_bounds)
+	cache = data.__dict__.setdefault("_compiled_constraints", {})
+	if bounds not in cache:
+		cache[bounds] = CompiledConstraints(data.tickers, data.mean_returns, bounds, getattr(data, "constraints", None))
+	return cache[bounds]
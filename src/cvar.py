@@ -0,0 +1,194 @@
+import warnings
+import numpy as np
+from scipy import sparse
+import highspy
+from typing import Tuple
+from Portfolio import Portfolio
+from constraints import compile_constraints
+from PortfolioData import PortfolioData
+
+default_confidence = 0.95
+held_threshold = 1e-6 # Weights below this are treated as not held (floating point error)
+
+
+class CVaRProblem:
+	def __init__(self, data: PortfolioData, bounds: Tuple[float, float] = None, confidence=default_confidence):
+		"""
+		Builds the historical-scenario CVaR linear program once per universe as a HiGHS model.
+
+		Rockafellar-Uryasev form over T daily scenarios and N assets, with x = [w, alpha, u]:
+			min  alpha + 1 / ((1 - confidence) T) * sum(u)
+			s.t. u_t >= -r_t . w - alpha,  u >= 0,  sum(w) = 1,  [mean_returns . w = target]
+
+		Per-asset bounds, group caps and turnover come from data.constraints. The model is
+		kept between solves and only the bounds of the target row change, so a frontier
+		sweep warm-starts the simplex from the previous basis instead of rebuilding.
+
+		Scenarios are the dates on which every asset that may be held (upper bound > 0) has
+		a return; filling missing returns with 0 would make short-lived assets look riskless.
+		One recent listing therefore shortens the sample for the whole universe: the dates
+		used are kept in scenario_dates, and a warning names thin-history tickers (see
+		PortfolioData.coverage) that cut the sample. Target returns are still on the
+		full-history mean_returns, like the mean-variance frontier.
+
+		Args:
+			data (PortfolioData): Universe; data.log_returns rows are the scenarios
+			bounds (Tuple[float, float]): Default per-asset weight bounds
+			confidence (float): CVaR confidence level (e.g. 0.95 = worst 5% of days)
+		"""
+		self.data = data
+		self.confidence = confidence
+		compiled = compile_constraints(data, bounds)
+
+		holdable = compiled.upper > 0
+		returns = np.asarray(data.log_returns, dtype=float)
+		rows = scenario_rows(returns, holdable)
+		scenarios = np.nan_to_num(returns[rows])
+		T, n = scenarios.shape
+		self.scenario_dates = data.log_returns.index[rows]
+
+		truncating = holdable & ~np.isfinite(returns[~rows]).all(axis=0)
+		thin = np.asarray(data.coverage["thin"]) & truncating
+		if thin.any():
+			warnings.warn(f"CVaR uses {T} of {len(rows)} dates (from {self.scenario_dates[0]:%Y-%m-%d}), "
+						  f"limited by thin-history tickers {', '.join(np.asarray(data.tickers)[thin])}.")
+		self.n = n
+		# Turnover is linearized with d >= |w - holdings|, sum(d) <= turnover
+		k = n if compiled.turnover is not None else 0
+
+		def row_block(w_block, d_block=None):
+			rows = w_block.shape[0]
+			return sparse.hstack([
+				w_block, sparse.csr_matrix((rows, 1 + T)),
+				d_block if d_block is not None else sparse.csr_matrix((rows, k)),
+			], format="csr")
+
+		blocks = [sparse.hstack([
+			sparse.csr_matrix(-scenarios),
+			sparse.csr_matrix(-np.ones((T, 1))),
+			-sparse.identity(T, format="csr"),
+			sparse.csr_matrix((T, k)),
+		], format="csr")]
+		b_ub = [np.zeros(T)]
+
+		has_upper, has_lower = np.isfinite(compiled.group_upper), np.isfinite(compiled.group_lower)
+		blocks += [row_block(compiled.groups[has_upper]), row_block(-compiled.groups[has_lower])]
+		b_ub += [compiled.group_upper[has_upper], -compiled.group_lower[has_lower]]
+
+		if k:
+			identity = sparse.identity(n, format="csr")
+			blocks += [row_block(identity, -identity), row_block(-identity, -identity),
+					   row_block(sparse.csr_matrix((1, n)), sparse.csr_matrix(np.ones((1, n))))]
+			b_ub += [compiled.holdings, -compiled.holdings, [compiled.turnover]]
+
+		# Budget and target rows last; the target row starts free (no target)
+		blocks += [row_block(sparse.csr_matrix(np.ones((1, n)))), row_block(sparse.csr_matrix(compiled.mean_returns[None, :]))]
+		A = sparse.vstack(blocks, format="csc")
+		b_ub = np.concatenate(b_ub)
+		self._target_row = A.shape[0] - 1
+
+		lp = highspy.HighsLp()
+		lp.num_col_, lp.num_row_ = A.shape[1], A.shape[0]
+		lp.col_cost_ = np.concatenate([np.zeros(n), [1.0], np.full(T, 1 / ((1 - confidence) * T)), np.zeros(k)])
+		lp.col_lower_ = np.concatenate([compiled.lower, [-highspy.kHighsInf], np.zeros(T + k)])
+		lp.col_upper_ = np.concatenate([compiled.upper, np.full(1 + T + k, highspy.kHighsInf)])
+		lp.row_lower_ = np.concatenate([np.full(len(b_ub), -highspy.kHighsInf), [1.0, -highspy.kHighsInf]])
+		lp.row_upper_ = np.concatenate([b_ub, [1.0, highspy.kHighsInf]])
+		lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+		lp.a_matrix_.start_ = A.indptr
+		lp.a_matrix_.index_ = A.indices
+		lp.a_matrix_.value_ = A.data
+
+		self._highs = highspy.Highs()
+		self._highs.setOptionValue("output_flag", False)
+		self._highs.passModel(lp)
+
+	def solve(self, target_return: float = None) -> np.ndarray:
+		"""
+		Solves for minimum CVaR weights, optionally at a target (annualized) return.
+
+		Returns:
+			np.ndarray: Portfolio weights
+		"""
+		if target_return is None:
+			self._highs.changeRowBounds(self._target_row, -highspy.kHighsInf, highspy.kHighsInf)
+		else:
+			self._highs.changeRowBounds(self._target_row, target_return, target_return)
+
+		self._highs.run()
+
+		if self._highs.getModelStatus() != highspy.HighsModelStatus.kOptimal:
+			raise ValueError("Optimization failed to find minimum CVaR portfolio.")
+
+		return np.array(self._highs.getSolution().col_value[:self.n])
+
+
+def min_cvar_portfolio(data: PortfolioData, bounds: Tuple[float, float] = None, confidence=default_confidence) -> Portfolio:
+	return Portfolio(data, CVaRProblem(data, bounds, confidence).solve())
+
+
+def from_target_return(data: PortfolioData, target_return: float, bounds: Tuple[float, float] = None,
+					   confidence=default_confidence) -> Portfolio:
+	return Portfolio(data, CVaRProblem(data, bounds, confidence).solve(target_return))
+
+
+def cvar_frontier(data: PortfolioData, bounds: Tuple[float, float], points=50, confidence=default_confidence) -> np.ndarray[Portfolio]:
+	"""
+	Computes the mean-CVaR frontier (minimum CVaR portfolios for range of target returns).
+
+	Args:
+		data (PortfolioData): Universe
+		bounds (Tuple[float, float]): Per-asset weight bounds
+		points (int): Number of portfolios to generate along frontier
+		confidence (float): CVaR confidence level
+
+	Returns:
+		np.ndarray[Portfolio]: Frontier portfolios (targets that fail to solve are skipped)
+	"""
+	problem = CVaRProblem(data, bounds, confidence)
+	mean_returns = data.mean_returns
+
+	frontier_portfolios = []
+
+	for target in np.linspace(mean_returns.min(), mean_returns.max(), points):
+		try:
+			frontier_portfolios.append(Portfolio(data, problem.solve(target)))
+		except ValueError:
+			continue
+
+	return np.array(frontier_portfolios)
+
+
+def historical_cvar(portfolio: Portfolio, confidence=default_confidence) -> float:
+	"""
+	Historical CVaR of a portfolio: mean daily loss over the worst (1 - confidence) of scenarios.
+
+	Returns:
+		float: Daily CVaR as a positive loss, over the dates on which every held asset has a return
+	"""
+	held = np.abs(portfolio.weights) > held_threshold
+	returns = np.asarray(portfolio.data.log_returns, dtype=float)
+	losses = -(returns[scenario_rows(returns, held)][:, held] @ portfolio.weights[held])
+	var = np.quantile(losses, confidence)
+
+	# Uses the held assets' dates and an interpolated VaR, so it can differ from the CVaRProblem
+	# objective (all holdable assets' dates) when histories differ
+	return float(var + np.mean(np.maximum(losses - var, 0)) / (1 - confidence))
+
+
+def scenario_rows(returns: np.ndarray, assets: np.ndarray) -> np.ndarray:
+	"""
+	Scenario dates: the rows of returns on which all of assets have a return.
+
+	Args:
+		returns (np.ndarray): Daily log returns (dates x assets), NaN where an asset has none
+		assets (np.ndarray): Boolean mask of the assets that must be valid
+
+	Returns:
+		np.ndarray: Boolean mask of the usable rows
+	"""
+	rows = np.isfinite(returns[:, assets]).all(axis=1)
+	if not rows.any():
+		raise ValueError("No dates on which every holdable asset has a return.")
+
+	return rows
@@ -0,0 +1,158 @@
+import json
+import os
+import uuid
+import numpy as np
+from datetime import datetime
+from typing import Tuple, Dict, Sequence
+from Portfolio import Portfolio
+from PortfolioData import PortfolioData
+from plot import efficient_frontier
+
+export_formats = ("parquet", "arrow", "npz")
+
+
+def frontier_results(data: PortfolioData, bounds: Tuple[float, float], points=50,
+					 frontier_portfolios: Sequence[Portfolio] = None) -> Dict[str, np.ndarray]:
+	"""
+	Collects the efficient frontier, tangency and GMV portfolios into column arrays.
+
+	Args:
+		data (PortfolioData): Universe the portfolios were solved on
+		bounds (Tuple[float, float]): Per-asset weight bounds
+		points (int): Number of frontier points (ignored if frontier_portfolios is given)
+		frontier_portfolios (Sequence[Portfolio]): Already solved frontier, e.g. from the plot axes
+
+	Returns:
+		Dict[str, np.ndarray]: kind, weights (points x assets), expected_return, volatility, sharpe
+	"""
+	if frontier_portfolios is None:
+		frontier_portfolios = efficient_frontier(data, bounds, points=points)
+	elif any(p.data is not data for p in frontier_portfolios):
+		raise ValueError("Frontier portfolios were solved on different data than the one being exported.")
+
+	portfolios = list(frontier_portfolios) + [
+		Portfolio.max_sharpe_portfolio(data, bounds),
+		Portfolio.min_variance_portfolio(data, bounds),
+	]
+	kind = np.array(["frontier"] * len(frontier_portfolios) + ["tangency", "gmv"])
+	weights = np.vstack([p.weights for p in portfolios])
+
+	# Evaluate every point at once instead of through the per-portfolio properties
+	mean_returns = np.asarray(data.mean_returns)
+	covariance = np.asarray(data.annualized_covariance)
+	expected_return = weights @ mean_returns
+	volatility = np.sqrt(np.einsum("ij,jk,ik->i", weights, covariance, weights))
+	sharpe = (expected_return - data.risk_free_rate) / volatility
+
+	return {
+		"kind": kind,
+		"weights": weights,
+		"expected_return": expected_return,
+		"volatility": volatility,
+		"sharpe": sharpe,
+	}
+
+
+def frontier_metadata(data: PortfolioData, bounds: Tuple[float, float]) -> dict:
+	"""
+	Describes the run a frontier export came from.
+
+	Returns:
+		dict: JSON-serializable tickers, window, bounds, constraints (ConstraintSpec.to_dict) and risk-free rate
+	"""
+	constraints = getattr(data, "constraints", None)
+	return {
+		"tickers": list(data.tickers),
+		"start": str(data.start),
+		"end": str(data.end),
+		"bounds": [float(bounds[0]), float(bounds[1])],
+		"constraints": None if constraints is None else constraints.to_dict(),
+		"risk_free_rate": float(data.risk_free_rate),
+		"created": datetime.now().isoformat(timespec="seconds"),
+	}
+
+
+def export_frontier(path: str, data: PortfolioData, bounds: Tuple[float, float], points=50, *,
+					fmt: str = "parquet", frontier_portfolios: Sequence[Portfolio] = None, partition: str = None) -> str:
+	"""
+	Appends one run's frontier to a partitioned dataset directory in a single write.
+
+	Files are written as <path>/run_date=<partition>/part-<run_id>.<fmt>, so repeated
+	runs only ever add files and never rewrite earlier ones. Parquet/Arrow files use a
+	long layout (run_id, point, kind, ticker, weight, metrics, window, bounds, constraints, rf) that
+	reads back as one dataset across universes; npz keeps the weight matrix per file.
+
+	Args:
+		path (str): Dataset root directory
+		data (PortfolioData): Universe the portfolios were solved on
+		bounds (Tuple[float, float]): Per-asset weight bounds
+		points (int): Number of frontier points (ignored if frontier_portfolios is given)
+		fmt (str): "parquet", "arrow" or "npz"; keep it fixed per dataset so parts don't mix formats
+		frontier_portfolios (Sequence[Portfolio]): Already solved frontier to reuse
+		partition (str): Partition value (default: today, YYYY-MM-DD)
+
+	Returns:
+		str: Path of the written file
+	"""
+	if fmt not in export_formats:
+		raise ValueError(f"Unknown export format {fmt!r}, expected one of {export_formats}.")
+
+	results = frontier_results(data, bounds, points, frontier_portfolios)
+	metadata = frontier_metadata(data, bounds)
+	run_id = f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+	metadata["run_id"] = run_id
+
+	partition = partition or f"{datetime.now():%Y-%m-%d}"
+	directory = os.path.join(path, f"run_date={partition}")
+	os.makedirs(directory, exist_ok=True)
+	file_path = os.path.join(directory, f"part-{run_id}.{fmt}")
+
+	if fmt == "npz":
+		np.savez(file_path, tickers=np.array(metadata["tickers"]), metadata=np.array(json.dumps(metadata)), **results)
+	else:
+		_write_arrow(file_path, fmt, results, metadata)
+
+	return file_path
+
+
+def _write_arrow(file_path: str, fmt: str, results: Dict[str, np.ndarray], metadata: dict):
+	try:
+		import pyarrow as pa
+		import pyarrow.parquet as pq
+		import pyarrow.feather as feather
+	except ImportError as e:
+		raise ImportError("Parquet/Arrow export requires pyarrow (pip install pyarrow), or use fmt=\"npz\".") from e
+
+	# Long layout (one row per point and ticker) with run metadata as columns, so runs over
+	# different universes append to the same schema and stay distinguishable in dataset reads
+	weights = results["weights"]
+	n_points, n_assets = weights.shape
+	rows = n_points * n_assets
+
+	def repeat(values):
+		return np.repeat(values, n_assets)
+
+	def constant(value):
+		return pa.array([value] * rows).dictionary_encode()
+
+	table = pa.table({
+		"run_id": constant(metadata["run_id"]),
+		"point": repeat(np.arange(n_points)),
+		"kind": pa.array(repeat(results["kind"])).dictionary_encode(),
+		"ticker": pa.array(np.tile(np.array(metadata["tickers"], dtype=str), n_points)).dictionary_encode(),
+		"weight": weights.ravel(),
+		"expected_return": repeat(results["expected_return"]),
+		"volatility": repeat(results["volatility"]),
+		"sharpe": repeat(results["sharpe"]),
+		"start": constant(metadata["start"]),
+		"end": constant(metadata["end"]),
+		"bounds_min": np.full(rows, metadata["bounds"][0]),
+		"bounds_max": np.full(rows, metadata["bounds"][1]),
+		"constraints": constant(json.dumps(metadata["constraints"], sort_keys=True)),
+		"risk_free_rate": np.full(rows, metadata["risk_free_rate"]),
+	}).replace_schema_metadata({"mvo": json.dumps(metadata)})
+
+	if fmt == "parquet":
+		pq.write_table(table, file_path)
+	else:
+		feather.write_feather(table, file_path)
@@ -1,7 +1,11 @@
+import threading
 from functools import lru_cache
 import pandas as pd
 import yfinance as yf
-from typing import Tuple
+from typing import Tuple, Dict
+
+_download_lock = threading.Lock()
+_ticker_cache: Dict[Tuple[str, str, str], pd.Series] = {}
 
 @lru_cache()
 def fetch_data(tickers: Tuple[str], start: str, end: str) -> pd.DataFrame:
@@ -16,11 +20,37 @@ def fetch_data(tickers: Tuple[str], start: str, end: str) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame of adjusted close prices (columns = tickers)
     """
-	prices = pd.DataFrame()
+	# Outer join on dates, so a late listing or a missing print doesn't drop other tickers' dates
+	series = [prices.rename(ticker) for ticker, prices in fetch_tickers(tickers, start, end).items()]
+	prices = pd.concat(series, axis=1, join="outer", sort=True)
+
+	return prices
+
+def fetch_tickers(tickers: Tuple[str], start: str, end: str) -> Dict[str, pd.Series]:
+	"""
+    Downloads historical adjusted close prices per ticker, in one request for all uncached tickers.
 
-	for ticker in tickers:
-		data = yf.download(ticker, start=start, end=end, auto_adjust=False, progress=False)
+    Cached per ticker, so universes sharing tickers only download each one once.
+    yf.download isn't thread-safe (it resets module-global state on every call),
+    so downloads are serialized; a single call already fetches tickers in parallel.
 
-		prices[ticker] = data["Adj Close"]
+    Args:
+        tickers (Tuple[str]): Asset tickers
+        start (str): Start date (YYYY-MM-DD)
+        end (str): End date (YYYY-MM-DD)
+
+    Returns:
+        Dict[str, pd.Series]: Adjusted close prices by ticker, each on its own trading dates
+    """
+	with _download_lock:
+		missing = [t for t in dict.fromkeys(tickers) if (t, start, end) not in _ticker_cache]
+		if missing:
+			data = yf.download(missing, start=start, end=end, auto_adjust=False, progress=False)["Adj Close"]
+			if isinstance(data, pd.Series):
+				data = data.to_frame(missing[0])
+			for ticker in missing:
+				# The batch is aligned on the union of dates, keep each ticker's own history
+				prices = data[ticker].dropna() if ticker in data else pd.Series(dtype=float)
+				_ticker_cache[(ticker, start, end)] = prices
 
-	return prices
\ No newline at end of file
+		return {t: _ticker_cache[(t, start, end)] for t in tickers}
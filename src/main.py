@@ -1,21 +1,71 @@
 # Assumes 252 trading days in a year
 #
 # Tristan Mihocko
+import os
 import sys
-from app import PortfolioWindow
-from PyQt6.QtWidgets import QApplication
+import argparse
+from datetime import datetime, timedelta
 from parse_csv import parse_tickers
+from universe import UniverseComparison, universe_name
+from constraints import ConstraintSpec
 
-file_path = sys.argv[1] if len(sys.argv) > 1 else "tickers.csv"
+parser = argparse.ArgumentParser(description="Mean-Variance Portfolio Optimization")
+parser.add_argument("files", nargs="*", default=["tickers.csv"], help="Ticker CSVs, one universe each (first is the main one)")
+parser.add_argument("--headless", action="store_true", help="Print a comparison report instead of opening the window")
+parser.add_argument("--max-weight", type=float, default=1, help="Max weight per asset (headless)")
+parser.add_argument("--points", type=int, default=100, help="Frontier points (headless)")
+parser.add_argument("--plot", help="Save an overlay of all frontiers to this image (headless)")
+parser.add_argument("--constraints", help="Constraints JSON (default: constraints.json next to the first CSV, if present)")
 
 def main():
-	tickers = parse_tickers(file_path)
+	args, qt_args = parser.parse_known_args()
+	args.constraints = load_constraints(args)
 
-	app = QApplication(sys.argv)
-	window = PortfolioWindow(tickers)
+	if args.headless:
+		headless(args)
+		return
+
+	from app import PortfolioWindow
+	from PyQt6.QtWidgets import QApplication
+
+	tickers = parse_tickers(args.files[0])
+	others = {universe_name(f): parse_tickers(f) for f in args.files[1:]}
+
+	app = QApplication(sys.argv[:1] + qt_args)
+	window = PortfolioWindow(tickers, others, args.constraints)
 	window.show()
 	sys.exit(app.exec())
-	
+
+def headless(args):
+	end = datetime.now()
+	start = end - timedelta(days=10*365)
+	bounds = (0, args.max_weight)
+
+	with UniverseComparison(start, end, constraints=args.constraints) as comparison:
+		for f in args.files:
+			comparison.add_csv(f)
+
+		print(comparison.report(bounds, args.points).to_string(float_format="{:.4f}".format))
+
+		if args.plot:
+			from matplotlib.figure import Figure
+			from plot import plot_frontier_overlay
+
+			fig = Figure(figsize=(8, 6))
+			ax = fig.add_subplot(111)
+			plot_frontier_overlay(ax, comparison.frontiers(bounds, args.points))
+			ax.set_xlabel("Portfolio Risk (σ)")
+			ax.set_ylabel("Expected Portfolio Return (μ)")
+			ax.set_title("Efficient Frontiers")
+			ax.grid(True)
+			fig.savefig(args.plot)
+
+def load_constraints(args):
+	file_path = args.constraints or os.path.join(os.path.dirname(args.files[0]), "constraints.json")
+	if args.constraints or os.path.exists(file_path):
+		return ConstraintSpec.from_json(file_path)
+	return None
+
 
 if __name__ == "__main__":
-	main()
\ No newline at end of file
+	main()
@@ -2,7 +2,8 @@
 import matplotlib.pyplot as plt
 from matplotlib.collections import LineCollection
 import numpy as np
-from Portfolio import Portfolio, PortfolioData
+from Portfolio import Portfolio, PortfolioData, risk, risk_gradient
+from constraints import compile_constraints
 from typing import Tuple
 from scipy.optimize import minimize
 
@@ -116,6 +117,32 @@ def plot_efficient_frontier(ax, data: PortfolioData, bounds: Tuple[float, float]
 	return artists
 
 
+def plot_frontier_overlay(ax, frontiers, *, show_tangency=True):
+	"""
+	Overlays other universes' frontiers on an existing axes.
+
+	Args:
+		ax: Matplotlib axes
+		frontiers (Dict[str, UniverseFrontier]): Solved frontiers by universe name
+		show_tangency (bool): Mark each universe's tangency portfolio
+
+	Returns:
+		dict: Line artists by universe name
+	"""
+	artists = {}
+	for name, frontier in frontiers.items():
+		line = ax.plot(frontier.risks, frontier.returns, linewidth=1.5, alpha=curve_alpha, label=name)[0]
+		if show_tangency:
+			ax.scatter(
+				frontier.tangency.expected_volatility, frontier.tangency.expected_return,
+				color=line.get_color(), marker="D", s=dot_size*0.6, zorder=3
+			)
+		artists[name] = line
+
+	ax.legend()
+	return artists
+
+
 def efficient_frontier(data: PortfolioData, bounds: Tuple[float, float], points=50) -> np.ndarray[Portfolio]:
 	"""
 	Computes the efficient frontier (minimum risk portfolios for range of target returns).
@@ -133,31 +160,20 @@ def efficient_frontier(data: PortfolioData, bounds: Tuple[float, float], points=
 			- List[np.ndarray]: Portfolio weights for each frontier point
 			- np.ndarray: Sharpe ratios for each frontier point
 	"""
-	tickers = data.tickers
-
-	log_returns = data.log_returns
-	annualized_covariance = data.annualized_covariance
-	mean_returns = log_returns.mean() * 252
-
-	n = log_returns.shape[1]
+	annualized_covariance = np.asarray(data.annualized_covariance)
+	mean_returns = data.mean_returns
+	compiled = compile_constraints(data, bounds) # Shared by every point, only the target changes
+	fun, jac = compiled.objective(risk, risk_gradient)
 
 	frontier_portfolios = []
 
 	target_returns = np.linspace(mean_returns.min(), mean_returns.max(), points)
     
 	for target in target_returns:
-		constraints = (
-			{"type": "eq", "fun": lambda w: np.sum(w) - 1},
-			{"type": "eq", "fun": lambda w: np.sum(w * mean_returns) - target}
-		)
-		initial_weights = np.array([1 / len(tickers)] * len(tickers))
-
-		def risk(weights: np.ndarray, cov_matrix: np.ndarray) -> float:
-			return np.sqrt(weights.T @ cov_matrix @ weights)
-		
-		result = minimize(risk, initial_weights, args=(annualized_covariance,), method="SLSQP", bounds=[bounds]*n, constraints=constraints)
+		result = minimize(fun, compiled.initial_weights(), args=(annualized_covariance,), method="SLSQP", jac=jac,
+						  bounds=compiled.bounds, constraints=compiled.with_target(target))
 		if result.success:
-			weights = result.x
+			weights = compiled.weights(result.x)
 			frontier_portfolios.append(Portfolio(data, weights))
 
 	return np.array(frontier_portfolios)
@@ -0,0 +1,386 @@
+import copy
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve, LinAlgError
+from typing import Tuple, Dict, Union
+from Portfolio import Portfolio
+from PortfolioData import PortfolioData
+from constraints import compile_constraints, CompiledConstraints
+
+active_tolerance = 1e-6 # Weights this close to a bound (or groups to a cap) are treated as active
+kkt_tolerance = 1e-7 # Allowed primal/dual violation before the active set is considered changed
+max_pivots = 10 # Cheap active-set changes tried before falling back to a full solve
+
+portfolio_kinds = ("max_sharpe", "min_variance", "target_return")
+
+
+def what_if(data: PortfolioData, mean_returns: Union[np.ndarray, Dict[str, float]] = None,
+			risk_free_rate: float = None) -> PortfolioData:
+	"""
+	Copies data with perturbed inputs, sharing its prices, returns and covariance.
+
+	Args:
+		data (PortfolioData): Universe to perturb
+		mean_returns (np.ndarray | Dict[str, float]): New annualized mean returns, or {ticker: value} overrides
+		risk_free_rate (float): New annualized risk-free rate
+
+	Returns:
+		PortfolioData: Perturbed copy (data itself if nothing changes)
+	"""
+	if mean_returns is None and risk_free_rate is None:
+		return data
+
+	perturbed = copy.copy(data)
+	perturbed.__dict__.pop("_compiled_constraints", None) # Compiled target rows hold the old mean returns
+
+	if mean_returns is not None:
+		if isinstance(mean_returns, dict):
+			updated = np.array(data.mean_returns, dtype=float)
+			for ticker, value in mean_returns.items():
+				updated[list(data.tickers).index(ticker)] = value
+			mean_returns = updated
+		perturbed.__dict__["mean_returns"] = np.asarray(mean_returns, dtype=float)
+	if risk_free_rate is not None:
+		perturbed.risk_free_rate = risk_free_rate
+
+	return perturbed
+
+
+class ParametricPortfolio:
+	def __init__(self, data: PortfolioData, kind: str, bounds: Tuple[float, float] = None, target_return: float = None):
+		"""
+		An optimal portfolio that can be cheaply re-solved after small input changes.
+
+		After a full SLSQP solve, the active set (assets at a bound, groups at a cap) is
+		fixed and the problem becomes an equality-constrained QP: variance directly, and
+		max Sharpe through its homogenized form (min y'Σy s.t. (μ - rf)'y = 1, w = y / 1'y).
+		The Cholesky factor of its reduced Hessian is kept, so a change in μ, rf, the target
+		or a bound value costs a few triangular solves. If the re-solved point violates the
+		KKT conditions, the active set is pivoted (refactoring the Hessian) up to max_pivots
+		times before falling back to a full solve. A turnover limit lifts the problem to
+		[w, buys, sells] variables that this active set doesn't model, so it always takes
+		the full solve.
+
+		Args:
+			data (PortfolioData): Universe
+			kind (str): "max_sharpe", "min_variance" or "target_return"
+			bounds (Tuple[float, float]): Default per-asset weight bounds
+			target_return (float): Target return (for "target_return")
+		"""
+		if kind not in portfolio_kinds:
+			raise ValueError(f"Unknown portfolio kind {kind!r}.")
+
+		self.kind = kind
+		self.bounds = bounds
+		self.target_return = target_return
+		self.full_solves = 0
+		self._factor = None
+		self._full_solve(data, bounds, target_return)
+
+	def resolve(self, mean_returns: Union[np.ndarray, Dict[str, float]] = None, risk_free_rate: float = None,
+				bounds: Tuple[float, float] = None, target_return: float = None) -> Portfolio:
+		"""
+		Re-solves for perturbed inputs, reusing the last active set and factorization when possible.
+
+		Perturbations accumulate: mean_returns overrides apply to the last re-solved inputs.
+
+		Returns:
+			Portfolio: Optimal portfolio on the perturbed data
+		"""
+		data = what_if(self.data, mean_returns, risk_free_rate)
+		bounds = bounds or self.bounds
+		target_return = self.target_return if target_return is None else target_return
+		compiled = compile_constraints(data, bounds)
+
+		if compiled.turnover is None and self._active is not None:
+			solution = self._refine(data, compiled, target_return)
+			if solution is not None:
+				self._accept(data, bounds, target_return, solution)
+				return self.portfolio
+
+		return self._full_solve(data, bounds, target_return)
+
+	def sensitivity(self) -> np.ndarray:
+		"""
+		Derivatives of the weights with respect to the annualized mean returns.
+
+		Valid while the active set doesn't change.
+
+		Returns:
+			np.ndarray: Jacobian (assets x assets), entry [i, j] = d w_i / d μ_j
+		"""
+		n = len(self.data.tickers)
+		if self.kind == "min_variance" or self._active is None:
+			return np.zeros((n, n))
+
+		P, C = self._system.P, self._system.C
+		z, lam = self._z, self._lambda
+		# The μ-dependent row: μ'w = target (row 1 after the budget) or (μ - rf)'y = 1 (row 0)
+		row = 1 if self.kind == "target_return" else 0
+		v = P @ z + (self._system.offset if self.kind == "target_return" else 0)
+
+		r1 = -lam[row] * P.T # Column j: -λ_r P[j, :]
+		r2 = np.zeros((C.shape[0], n))
+		r2[row] = -v
+		dz, _ = self._kkt_solve(r1, r2)
+		dv = P @ dz
+
+		if self.kind == "target_return":
+			return dv
+
+		kappa = v.sum()
+		return (dv - np.outer(self.portfolio.weights, dv.sum(axis=0))) / kappa
+
+	def _full_solve(self, data: PortfolioData, bounds: Tuple[float, float], target_return: float) -> Portfolio:
+		self.full_solves += 1
+
+		if self.kind == "max_sharpe":
+			portfolio = Portfolio.max_sharpe_portfolio(data, bounds)
+		elif self.kind == "min_variance":
+			portfolio = Portfolio.min_variance_portfolio(data, bounds)
+		else:
+			portfolio = Portfolio.from_target_return(data, target_return, bounds)
+
+		self.data, self.bounds, self.target_return, self.portfolio = data, bounds, target_return, portfolio
+		compiled = compile_constraints(data, bounds)
+		self._active = None
+		if compiled.turnover is not None:
+			return portfolio
+
+		# Identify the active set from the SLSQP solution, then polish it to the exact KKT point
+		weights = portfolio.weights
+		self._active = (
+			weights <= compiled.lower + active_tolerance,
+			weights >= compiled.upper - active_tolerance,
+			compiled.groups @ weights <= compiled.group_lower + active_tolerance,
+			compiled.groups @ weights >= compiled.group_upper - active_tolerance,
+		)
+		solution = self._refine(data, compiled, target_return)
+		if solution is not None:
+			self._accept(data, bounds, target_return, solution)
+		else:
+			self._active = None # Degenerate point, next resolve runs a full solve
+
+		return self.portfolio
+
+	def _accept(self, data, bounds, target_return, solution):
+		weights, self._z, self._lambda = solution
+		self.data, self.bounds, self.target_return = data, bounds, target_return
+		self.portfolio = Portfolio(data, weights)
+
+	def _solve_active_set(self, data: PortfolioData, compiled: CompiledConstraints, target_return: float):
+		"""
+		Solves the equality-constrained QP for the current active set.
+
+		Returns:
+			Tuple | None: (weights, z, λ), or None if the reduced problem is degenerate
+		"""
+		at_lower, at_upper, group_lower, group_upper = self._active
+		free = np.flatnonzero(~(at_lower | at_upper))
+		n = len(data.tickers)
+		mean_returns = np.asarray(data.mean_returns, dtype=float)
+		covariance = np.asarray(data.annualized_covariance)
+
+		# Weights of assets held at a bound
+		fixed = np.where(at_upper, compiled.upper, np.where(at_lower, compiled.lower, 0.0))
+		groups = compiled.groups[group_lower | group_upper].toarray()
+		group_values = np.where(group_upper, compiled.group_upper, compiled.group_lower)[group_lower | group_upper]
+
+		E = np.zeros((n, len(free)))
+		E[free, np.arange(len(free))] = 1
+
+		if self.kind == "max_sharpe":
+			# y = P z with y_fixed = fixed * κ and κ = 1'y; w = y / κ
+			slack = 1 - fixed.sum()
+			if slack <= 0 or not len(free):
+				return None
+			P = E + np.outer(fixed, np.ones(len(free))) / slack
+			offset = np.zeros(n)
+			q = np.zeros(len(free))
+			C = np.vstack([(mean_returns - data.risk_free_rate) @ P, groups @ P - np.outer(group_values, np.ones(len(free))) / slack])
+			d = np.concatenate([[1.0], np.zeros(len(group_values))])
+		else:
+			# w = P z + fixed
+			P = E
+			offset = fixed
+			q = P.T @ covariance @ fixed
+			A = np.vstack([np.ones(n)] + ([mean_returns] if self.kind == "target_return" else []) + [groups])
+			b = np.concatenate([[1.0]] + ([[target_return]] if self.kind == "target_return" else []) + [group_values])
+			C = A @ P
+			d = b - A @ fixed
+
+		# The Hessian only depends on the active set (and fixed weights, for Sharpe), not on μ or rf
+		key = (free.tobytes(), fixed.tobytes() if self.kind == "max_sharpe" else None, id(data.annualized_covariance))
+		if self._factor is None or self._factor[0] != key:
+			try:
+				self._factor = (key, cho_factor(P.T @ covariance @ P))
+			except LinAlgError:
+				return None
+
+		self._system = _System(P, C, offset)
+		try:
+			z, lam = self._kkt_solve(-q, d)
+		except LinAlgError:
+			return None
+
+		if self.kind == "max_sharpe":
+			y = P @ z
+			if y.sum() <= 0:
+				return None
+			return y / y.sum(), z, lam
+
+		return P @ z + fixed, z, lam
+
+	def _kkt_solve(self, r1: np.ndarray, r2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+		# Solves [H C'; C 0] [z; λ] = [r1; r2] through the Schur complement S = C H^-1 C'
+		factor, C = self._factor[1], self._system.C
+		H_inv_r1 = cho_solve(factor, r1)
+		H_inv_Ct = cho_solve(factor, C.T)
+		lam = np.linalg.solve(C @ H_inv_Ct, C @ H_inv_r1 - r2)
+		return H_inv_r1 - H_inv_Ct @ lam, lam
+
+	def _refine(self, data: PortfolioData, compiled: CompiledConstraints, target_return: float):
+		"""
+		Pivots the active set until the active-set QP solution satisfies the KKT conditions.
+
+		Returns:
+			Tuple | None: (weights, z, λ), or None if it doesn't converge within max_pivots
+		"""
+		for _ in range(max_pivots + 1):
+			solution = self._solve_active_set(data, compiled, target_return)
+			if solution is None:
+				return None
+
+			active = self._pivot(data, compiled, solution[0])
+			if active is None:
+				return solution
+			if all(np.array_equal(a, b) for a, b in zip(active, self._active)):
+				return None # Not optimal, but nothing left to pivot on
+			self._active = active
+
+		return None
+
+	def _pivot(self, data: PortfolioData, compiled: CompiledConstraints, weights: np.ndarray):
+		"""
+		Checks the KKT conditions of weights under the current active set.
+
+		Returns:
+			Tuple | None: None if optimal, otherwise the next active set (violated limits added,
+				or if there are none, limits with wrong-signed multipliers released)
+		"""
+		at_lower, at_upper, group_lower, group_upper = (a.copy() for a in self._active)
+		free = ~(at_lower | at_upper)
+
+		# Primal: free weights and inactive groups within their limits
+		group_weights = compiled.groups @ weights
+		below = free & (weights < compiled.lower - kkt_tolerance)
+		above = free & (weights > compiled.upper + kkt_tolerance)
+		group_above = ~group_upper & (group_weights > compiled.group_upper + kkt_tolerance)
+		group_below = ~group_lower & (group_weights < compiled.group_lower - kkt_tolerance)
+		if below.any() or above.any() or group_above.any() or group_below.any():
+			return at_lower | below, at_upper | above, group_lower | group_below, group_upper | group_above
+
+		# Dual: multipliers of active bounds and caps must push the right way
+		mean_returns = np.asarray(data.mean_returns, dtype=float)
+		cov_weights = np.asarray(data.annualized_covariance) @ weights
+		if self.kind == "max_sharpe":
+			volatility = np.sqrt(weights @ cov_weights)
+			excess_return = mean_returns @ weights - data.risk_free_rate
+			gradient = -(mean_returns / volatility - excess_return * cov_weights / volatility**3)
+		else:
+			gradient = cov_weights
+
+		active_groups = group_lower | group_upper
+		A = np.vstack([np.ones(len(weights))] + ([mean_returns] if self.kind == "target_return" else [])
+					  + [compiled.groups[active_groups].toarray()])
+		nu = np.linalg.lstsq(A[:, free].T, -gradient[free], rcond=None)[0]
+		reduced = gradient + A.T @ nu
+		tolerance = kkt_tolerance * max(1.0, np.abs(gradient).max())
+
+		release_lower = at_lower & ~at_upper & (reduced < -tolerance)
+		release_upper = at_upper & ~at_lower & (reduced > tolerance)
+
+		group_nu = np.zeros(len(active_groups))
+		group_nu[active_groups] = nu[A.shape[0] - active_groups.sum():]
+		release_group_upper = group_upper & ~group_lower & (group_nu < -tolerance)
+		release_group_lower = group_lower & ~group_upper & (group_nu > tolerance)
+
+		if not (release_lower.any() or release_upper.any() or release_group_upper.any() or release_group_lower.any()):
+			if np.abs(reduced[free]).max(initial=0) > tolerance:
+				return at_lower, at_upper, group_lower, group_upper # Not stationary, unchanged set
+			return None
+
+		return at_lower & ~release_lower, at_upper & ~release_upper, \
+			group_lower & ~release_group_lower, group_upper & ~release_group_upper
+
+
+class _System:
+	def __init__(self, P: np.ndarray, C: np.ndarray, offset: np.ndarray):
+		self.P = P
+		self.C = C
+		self.offset = offset
+
+
+class ParametricFrontier:
+	def __init__(self, data: PortfolioData, bounds: Tuple[float, float] = None, points=50):
+		"""
+		Efficient frontier, tangency and GMV portfolios kept ready for fast what-if re-solves.
+
+		Args:
+			data (PortfolioData): Universe
+			bounds (Tuple[float, float]): Default per-asset weight bounds
+			points (int): Number of frontier points
+		"""
+		self.data = data
+		self.bounds = bounds
+		self.tangency = ParametricPortfolio(data, "max_sharpe", bounds)
+		self.gmv = ParametricPortfolio(data, "min_variance", bounds)
+		self._points = [self._point(data, target) for target in self._targets(data, points)]
+
+	def resolve(self, mean_returns: Union[np.ndarray, Dict[str, float]] = None, risk_free_rate: float = None,
+				bounds: Tuple[float, float] = None) -> np.ndarray[Portfolio]:
+		"""
+		Re-solves the frontier (targets re-spaced over the new mean returns), tangency and GMV.
+
+		Returns:
+			np.ndarray[Portfolio]: Frontier portfolios (targets that fail to solve are skipped)
+		"""
+		previous = self.data
+		self.data = what_if(self.data, mean_returns, risk_free_rate)
+		# Feasibility of a target only depends on the mean returns (which also place the targets) and bounds
+		feasible_set_changed = (bounds is not None and bounds != self.bounds) or \
+			not np.array_equal(np.asarray(previous.mean_returns), np.asarray(self.data.mean_returns))
+		self.bounds = bounds or self.bounds
+		self.tangency.resolve(self.data.mean_returns, self.data.risk_free_rate, self.bounds)
+		self.gmv.resolve(self.data.mean_returns, self.data.risk_free_rate, self.bounds)
+
+		for i, target in enumerate(self._targets(self.data, len(self._points))):
+			point = self._points[i]
+			if point is None:
+				if feasible_set_changed: # Otherwise still infeasible, don't pay for a full solve
+					self._points[i] = self._point(self.data, target)
+				continue
+			try:
+				point.resolve(self.data.mean_returns, self.data.risk_free_rate, self.bounds, target)
+			except ValueError:
+				self._points[i] = self._point(self.data, target) # Fresh full solve, None if infeasible
+
+		return self.portfolios
+
+	@property
+	def portfolios(self) -> np.ndarray[Portfolio]:
+		return np.array([p.portfolio for p in self._points if p is not None])
+
+	@property
+	def full_solves(self) -> int:
+		return sum(p.full_solves for p in [self.tangency, self.gmv] + self._points if p is not None)
+
+	def _point(self, data: PortfolioData, target: float):
+		try:
+			return ParametricPortfolio(data, "target_return", self.bounds, target)
+		except ValueError:
+			return None
+
+	@staticmethod
+	def _targets(data: PortfolioData, points: int) -> np.ndarray:
+		mean_returns = data.mean_returns
+		return np.linspace(mean_returns.min(), mean_returns.max(), points)
@@ -0,0 +1,230 @@
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+import numpy as np
+from concurrent.futures import Executor, Future
+from typing import Tuple, Dict, List, Sequence
+from Portfolio import Portfolio
+from constraints import ConstraintSpec
+from PortfolioData import PortfolioData
+
+shared_arrays = ("tickers", "mean_returns", "annualized_covariance", "log_returns")
+
+
+class SharedHandle:
+	def __init__(self, directory: str, risk_free_rate: float, constraints: ConstraintSpec = None):
+		"""
+		Picklable reference to a published universe; this is all a task carries.
+
+		Args:
+			directory (str): Directory holding the published .npy arrays
+			risk_free_rate (float): Annualized risk-free rate
+			constraints (ConstraintSpec): Universe constraints, compiled once per worker
+		"""
+		self.directory = directory
+		self.risk_free_rate = risk_free_rate
+		self.constraints = constraints
+
+
+class SharedPortfolioData:
+	def __init__(self, handle: SharedHandle):
+		"""
+		Read-only PortfolioData stand-in whose arrays are memory-mapped, not copied.
+
+		Provides what the Portfolio optimizers read: tickers, mean_returns,
+		annualized_covariance and risk_free_rate (log_returns is mapped on first use).
+		"""
+		self.handle = handle
+		self.risk_free_rate = handle.risk_free_rate
+		self.constraints = handle.constraints
+		self.tickers = tuple(self._load("tickers"))
+		self.mean_returns = self._load("mean_returns")
+		self.annualized_covariance = self._load("annualized_covariance")
+
+	@property
+	def log_returns(self) -> np.ndarray:
+		return self._load("log_returns")
+
+	def _load(self, name: str) -> np.ndarray:
+		return np.load(os.path.join(self.handle.directory, f"{name}.npy"), mmap_mode="r")
+
+
+class SharedStore:
+	def __init__(self, root: str = None):
+		"""
+		Publishes universes once as memory-mapped arrays for process-pool workers.
+
+		Each published universe is reference counted and its files are removed when the
+		last reference is released (or when the store is closed/garbage collected).
+
+		Args:
+			root (str): Parent directory (default: /dev/shm if available, else the temp dir)
+		"""
+		if root is None and os.path.isdir("/dev/shm"):
+			root = "/dev/shm" # RAM-backed on Linux
+		self.root = tempfile.mkdtemp(prefix="mvo-", dir=root)
+		self._refcounts: Dict[str, int] = {}
+		self._lock = threading.Lock()
+		self._finalizer = weakref.finalize(self, shutil.rmtree, self.root, True)
+
+	def publish(self, data: PortfolioData) -> SharedHandle:
+		"""
+		Writes a universe's arrays once and returns a handle holding one reference.
+
+		Returns:
+			SharedHandle: Handle to pass to solve tasks
+		"""
+		directory = tempfile.mkdtemp(dir=self.root)
+		arrays = {
+			"tickers": np.array(data.tickers, dtype=str),
+			"mean_returns": np.asarray(data.mean_returns, dtype=float),
+			"annualized_covariance": np.asarray(data.annualized_covariance, dtype=float),
+			"log_returns": np.asarray(data.log_returns, dtype=float),
+		}
+		for name in shared_arrays:
+			np.save(os.path.join(directory, f"{name}.npy"), arrays[name])
+
+		with self._lock:
+			self._refcounts[directory] = 1
+
+		return SharedHandle(directory, float(data.risk_free_rate), data.constraints)
+
+	def acquire(self, handle: SharedHandle) -> SharedHandle:
+		with self._lock:
+			if handle.directory not in self._refcounts:
+				raise ValueError("Shared universe has already been released.")
+			self._refcounts[handle.directory] += 1
+		return handle
+
+	def release(self, handle: SharedHandle):
+		with self._lock:
+			if handle.directory not in self._refcounts:
+				raise ValueError("Shared universe has already been released.")
+			self._refcounts[handle.directory] -= 1
+			if self._refcounts[handle.directory] > 0:
+				return
+			del self._refcounts[handle.directory]
+		# Workers drop their mappings on their next task (see attach), or explicitly via detach
+		shutil.rmtree(handle.directory, ignore_errors=True)
+
+	def close(self):
+		with self._lock:
+			self._refcounts.clear()
+			self._finalizer()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+
+_attached: Dict[str, SharedPortfolioData] = {} # Per worker process, so each universe is mapped once
+
+def attach(handle: SharedHandle) -> SharedPortfolioData:
+	"""
+	Maps a published universe in this process, reusing an earlier mapping.
+
+	Mappings of universes released since (their directory is gone) are dropped first,
+	so workers don't keep solving on, or pinning the pages of, released data.
+
+	Raises:
+		RuntimeError: If handle's universe has been released
+	"""
+	for directory in [d for d in _attached if not os.path.isdir(d)]:
+		del _attached[directory]
+
+	if not os.path.isdir(handle.directory):
+		raise RuntimeError("Shared universe has already been released.")
+
+	data = _attached.get(handle.directory)
+	if data is None:
+		data = _attached[handle.directory] = SharedPortfolioData(handle)
+	return data
+
+
+def detach(handle: SharedHandle = None):
+	"""
+	Drops this process's mapping of handle's universe (or of all universes).
+	"""
+	if handle is None:
+		_attached.clear()
+	else:
+		_attached.pop(handle.directory, None)
+
+
+def solve(handle: SharedHandle, kind: str, bounds: Tuple[float, float] = None, target: float = None) -> np.ndarray:
+	"""
+	Worker task: solves one portfolio on a shared universe and returns only its weights.
+
+	Args:
+		handle (SharedHandle): Published universe
+		kind (str): "max_sharpe", "min_variance" or "target_return"
+		bounds (Tuple[float, float]): Per-asset weight bounds
+		target (float): Target return (for "target_return")
+
+	Returns:
+		np.ndarray: Portfolio weights
+
+	Raises:
+		RuntimeError: If handle's universe has been released
+	"""
+	data = attach(handle)
+
+	if kind == "max_sharpe":
+		return Portfolio.max_sharpe_portfolio(data, bounds).weights
+	if kind == "min_variance":
+		return Portfolio.min_variance_portfolio(data, bounds).weights
+	if kind == "target_return":
+		return Portfolio.from_target_return(data, target, bounds).weights
+
+	raise ValueError(f"Unknown portfolio kind {kind!r}.")
+
+
+def solve_frontier(executor: Executor, handle: SharedHandle, bounds: Tuple[float, float],
+				   targets: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+	"""
+	Solves frontier points in parallel on an executor (e.g. ProcessPoolExecutor).
+
+	Targets that fail to solve are skipped, as in efficient_frontier; a released
+	handle raises RuntimeError rather than being skipped.
+
+	Returns:
+		Tuple:
+			- np.ndarray: Targets that solved
+			- np.ndarray: Weights (targets x assets)
+	"""
+	return gather_frontier(targets, submit_frontier(executor, handle, bounds, targets))
+
+
+def submit_frontier(executor: Executor, handle: SharedHandle, bounds: Tuple[float, float],
+					targets: Sequence[float]) -> List[Future]:
+	"""
+	Queues one solve task per target without waiting, so several universes can share the pool.
+
+	Returns:
+		List[Future]: Futures of the target weights, to pass to gather_frontier
+	"""
+	return [executor.submit(solve, handle, "target_return", bounds, target) for target in targets]
+
+
+def gather_frontier(targets: Sequence[float], futures: Sequence[Future]) -> Tuple[np.ndarray, np.ndarray]:
+	"""
+	Waits for submit_frontier's tasks, skipping targets that failed to solve.
+
+	Returns:
+		Tuple:
+			- np.ndarray: Targets that solved
+			- np.ndarray: Weights (targets x assets)
+	"""
+	solved, weights = [], []
+	for target, future in zip(targets, futures):
+		try:
+			weights.append(future.result())
+		except ValueError:
+			continue
+		solved.append(target)
+
+	return np.array(solved), np.array(weights)
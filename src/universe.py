@@ -0,0 +1,161 @@
+import os
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple, Dict, Sequence
+from Portfolio import Portfolio, default_bounds
+from constraints import ConstraintSpec
+from PortfolioData import PortfolioData, fred_risk_free_rate
+from fetch_data import fetch_tickers
+from parse_csv import parse_tickers
+from shared import SharedStore, SharedHandle, solve, submit_frontier, gather_frontier
+
+
+class UniverseFrontier:
+	def __init__(self, name: str, data: PortfolioData, bounds: Tuple[float, float], points: int,
+				 portfolios: Sequence[Portfolio], tangency: Portfolio, gmv: Portfolio):
+		"""
+		Solved efficient frontier, tangency and GMV portfolios of one universe.
+
+		Args:
+			name (str): Universe label
+			data (PortfolioData): Universe data
+			bounds (Tuple[float, float]): Per-asset weight bounds
+			points (int): Number of frontier points requested
+			portfolios (Sequence[Portfolio]): Frontier portfolios that solved
+			tangency (Portfolio): Maximum Sharpe ratio portfolio
+			gmv (Portfolio): Global minimum variance portfolio
+		"""
+		self.name = name
+		self.data = data
+		self.bounds = bounds
+		self.points = points
+
+		self.portfolios = np.array(portfolios)
+		self.tangency = tangency
+		self.gmv = gmv
+
+		self.risks = np.array([p.expected_volatility for p in self.portfolios])
+		self.returns = np.array([p.expected_return for p in self.portfolios])
+
+
+class UniverseComparison:
+	def __init__(self, start: str, end: str, risk_free_rate=None, max_workers=None, constraints: ConstraintSpec = None):
+		"""
+		Holds several candidate universes over one window and solves their frontiers on a process pool.
+
+		SLSQP runs Python callbacks under the GIL, so solves go to worker processes; each
+		universe is published once through a SharedStore and tasks only carry its handle.
+		Prices are shared through the per-ticker download cache, and solved frontiers are kept
+		per (universe, bounds, points), so adding a universe only fetches and solves what is new.
+
+		Args:
+			start (str): Start date (YYYY-MM-DD)
+			end (str): End date (YYYY-MM-DD)
+			risk_free_rate (float): Annualized risk-free rate (default: latest from FRED)
+			max_workers (int): Worker processes (default: ProcessPoolExecutor's, the CPU count)
+			constraints (ConstraintSpec): Constraints applied to every universe (tickers outside a universe are ignored)
+		"""
+		self.start = start
+		self.end = end
+		self.risk_free_rate = fred_risk_free_rate() if risk_free_rate is None else risk_free_rate
+		self.constraints = constraints
+		self.universes: Dict[str, PortfolioData] = {}
+		self._frontiers: Dict[Tuple[str, Tuple[float, float], int], UniverseFrontier] = {}
+		self._handles: Dict[str, SharedHandle] = {}
+		self._store = SharedStore()
+		# Spawned, not forked: the parent may be running Qt and download threads
+		self._pool = ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+	def add(self, name: str, tickers: Sequence[str]):
+		tickers = tuple(tickers)
+		if name in self.universes and self.universes[name].tickers == tickers:
+			return # Unchanged, keep solved frontiers
+
+		self.universes[name] = PortfolioData(tickers, self.start, self.end, self.risk_free_rate, constraints=self.constraints)
+		self._frontiers = {key: f for key, f in self._frontiers.items() if key[0] != name}
+		if name in self._handles:
+			self._store.release(self._handles.pop(name))
+
+	def add_csv(self, file_path: str, name: str = None):
+		name = name or universe_name(file_path)
+		self.add(name, parse_tickers(file_path))
+
+	def frontiers(self, bounds: Tuple[float, float] = None, points=50) -> Dict[str, UniverseFrontier]:
+		"""
+		Solves every universe that doesn't have a frontier for these settings yet.
+
+		All universes' tasks are queued before waiting on any, so the pool stays busy across universes.
+
+		Returns:
+			Dict[str, UniverseFrontier]: Frontiers by universe name, in insertion order
+		"""
+		bounds = tuple(bounds or default_bounds)
+		pending = [name for name in self.universes if (name, bounds, points) not in self._frontiers]
+
+		# Download each new ticker once, even if several universes hold it, in a single request
+		new_tickers = {t for name in pending for t in self.universes[name].tickers}
+		fetch_tickers(tuple(new_tickers), self.start, self.end)
+
+		tasks = {}
+		for name in pending:
+			data = self.universes[name]
+			if name not in self._handles:
+				self._handles[name] = self._store.publish(data)
+			handle = self._handles[name]
+
+			targets = np.linspace(data.mean_returns.min(), data.mean_returns.max(), points)
+			tasks[name] = (
+				targets,
+				submit_frontier(self._pool, handle, bounds, targets),
+				self._pool.submit(solve, handle, "max_sharpe", bounds),
+				self._pool.submit(solve, handle, "min_variance", bounds),
+			)
+
+		for name, (targets, frontier, tangency, gmv) in tasks.items():
+			data = self.universes[name]
+			_, weights = gather_frontier(targets, frontier)
+			self._frontiers[(name, bounds, points)] = UniverseFrontier(
+				name, data, bounds, points, [Portfolio(data, w) for w in weights],
+				Portfolio(data, tangency.result()), Portfolio(data, gmv.result()),
+			)
+
+		return {name: self._frontiers[(name, bounds, points)] for name in self.universes}
+
+	def report(self, bounds: Tuple[float, float] = None, points=50) -> pd.DataFrame:
+		"""
+		Summarizes each universe's tangency and GMV portfolios side by side, and lists
+		tickers with thin history (see PortfolioData.coverage).
+
+		Returns:
+			pd.DataFrame: One row per universe
+		"""
+		rows = {}
+		for name, f in self.frontiers(bounds, points).items():
+			rows[name] = {
+				"assets": len(f.data.tickers),
+				"tangency_return": f.tangency.expected_return,
+				"tangency_volatility": f.tangency.expected_volatility,
+				"tangency_sharpe": f.tangency.expected_sharpe_ratio,
+				"gmv_return": f.gmv.expected_return,
+				"gmv_volatility": f.gmv.expected_volatility,
+				"thin_tickers": ", ".join(f.data.coverage.index[f.data.coverage["thin"]]),
+			}
+
+		return pd.DataFrame.from_dict(rows, orient="index")
+
+	def close(self):
+		self._pool.shutdown()
+		self._store.close()
+		self._handles.clear()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+
+def universe_name(file_path: str) -> str:
+	return os.path.splitext(os.path.basename(file_path))[0]